@@ -1,50 +1,249 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import joblib
 import warnings
 import os
 import time
-import plotly.express as px
-import plotly.graph_objects as go
+import atexit
+import logging
+import threading
+import operator
+import bisect
+import uuid
+import copy
 from datetime import datetime
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 warnings.filterwarnings("ignore")
 st.set_page_config(page_title="Student Exam Score Predictor", layout="wide", page_icon="📊")
 
 # ----------------- PERSISTENT STORAGE FUNCTIONS ----------------- #
-def save_history_to_file():
-    """Save history to a local JSON file"""
+HISTORY_FILE = "student_predictions_data.json"
+SAVE_INTERVAL = 5.0  # seconds between deferred history writes
+WRITE_DELAY = 0.25  # seconds the writer thread waits to coalesce rapid saves
+MAX_HISTORY = 200  # oldest predictions are dropped beyond this many
+# Version 3 files are JSON Lines: a header line with the favorite entry ids, then one line
+# per entry. Version 2 stored favorites as history indices and entries had no "id".
+HISTORY_FORMAT_VERSION = 3  # bump when the layout of the history file changes
+
+def json_default(obj):
+    """Stdlib fallback for the types orjson serializes natively"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dump_json(data):
+    """Serialize data to compact JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=json_default).encode("utf-8")
+
+def load_json(raw):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def history_header(favorites):
+    """Header line of a history file in the current HISTORY_FORMAT_VERSION layout"""
+    return {
+        "version": HISTORY_FORMAT_VERSION,
+        "favorites": favorites,
+        "last_saved": datetime.now()  # the encoder writes it as an ISO 8601 string
+    }
+
+def write_history_data(history, favorites):
+    """Rewrite the local history file: a header line, then one JSON line per entry"""
+    lines = [dump_json(history_header(favorites))]
+    lines.extend(dump_json(entry) for entry in history)
+    # Write a per-process sibling file and swap it in, so a crash never leaves a
+    # half-written history and concurrent app processes never share a temp file.
+    # Within a process, writes are serialized by the HistoryWriter lock.
+    tmp_path = f"{HISTORY_FILE}.{os.getpid()}.tmp"
     try:
-        history_data = {
-            "history": st.session_state["history"],
-            "favorites": st.session_state["favorites"],
-            "last_saved": datetime.now().isoformat()
-        }
-        with open("student_predictions_data.json", "w") as f:
-            json.dump(history_data, f, indent=2)
-        return True
-    except Exception as e:
-        st.error(f"Error saving history to file: {e}")
-        return False
+        with open(tmp_path, "wb") as f:
+            f.write(b"\n".join(lines) + b"\n")
+        if os.path.exists(HISTORY_FILE):
+            # Keep the permissions of the file being replaced
+            os.chmod(tmp_path, os.stat(HISTORY_FILE).st_mode & 0o7777)
+        os.replace(tmp_path, HISTORY_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def append_history_entry(entry):
+    """Append one entry to the history file without re-serializing the earlier ones"""
+    with open(HISTORY_FILE, "ab") as f:
+        if f.tell() == 0:
+            # File was truncated by a clear, so nothing is favorited yet
+            f.write(dump_json(history_header([])) + b"\n")
+        f.write(dump_json(entry) + b"\n")
+
+def parse_history_file(raw):
+    """Parse history file bytes; single-document files from before version 2 are accepted too"""
+    if not raw.strip():
+        return {"history": [], "favorites": []}
+    try:
+        history_data = load_json(raw)
+    except ValueError:
+        history_data = None
+    if history_data is not None:
+        # A whole-file document: either an old-style file or a header with no entries yet
+        history_data.setdefault("history", [])
+        return history_data
+    header, *lines = raw.splitlines()
+    history = []
+    skipped = 0
+    for line in lines:
+        try:
+            history.append(load_json(line))
+        except ValueError:
+            skipped += 1  # torn line left by an interrupted append
+    history_data = load_json(header)
+    history_data["history"] = history
+    history_data["skipped_lines"] = skipped
+    return history_data
+
+@st.cache_data(max_entries=4)
+def read_history_file(path, mtime_ns, size):
+    """Parse the history file; modification time and size key the cache so edits are picked up"""
+    with open(path, "rb") as f:
+        return parse_history_file(f.read())
 
 def load_history_from_file():
     """Load history from local JSON file"""
     try:
-        if os.path.exists("student_predictions_data.json"):
-            with open("student_predictions_data.json", "r") as f:
-                history_data = json.load(f)
-            st.session_state["history"] = history_data.get("history", [])
-            st.session_state["favorites"] = history_data.get("favorites", [])
+        if os.path.exists(HISTORY_FILE):
+            stat = os.stat(HISTORY_FILE)
+            history_data = read_history_file(HISTORY_FILE, stat.st_mtime_ns, stat.st_size)
+            history = history_data.get("history", [])
+            backfill_study_profiles(history)
+            st.session_state["history"] = history
+            st.session_state["favorites"] = backfill_entry_ids(history, history_data.get("favorites", []))
+            if (history_data.get("version") != HISTORY_FORMAT_VERSION
+                    or history_data.get("skipped_lines")):
+                # Older layout or a torn line: rewrite the file before anything gets
+                # appended, or the next entry would land on the torn line
+                mark_history_dirty()
+            trim_history()
             return True
     except Exception as e:
         st.error(f"Error loading history from file: {e}")
+        # Keep the unreadable file for manual recovery, and make the next save a full
+        # rewrite so new entries are never appended to it
+        try:
+            os.replace(HISTORY_FILE, HISTORY_FILE + ".bad")
+        except OSError:
+            pass
+        mark_history_dirty()
     return False
 
+class HistoryWriter:
+    """Writes history snapshots on a daemon thread so saving never blocks a rerun"""
+    def __init__(self):
+        self.lock = threading.Lock()  # held while touching the file
+        self.pending = None
+        self.wakeup = threading.Event()
+        threading.Thread(target=self.run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def defer(self, history, favorites):
+        """Remember a snapshot without writing it (still written at exit)"""
+        with self.lock:
+            self.pending = (list(history), list(favorites))
+
+    def schedule(self, history, favorites):
+        """Queue a snapshot for the writer thread"""
+        self.defer(history, favorites)
+        self.wakeup.set()
+
+    def append(self, entry):
+        """Append one entry now; returns False if a full rewrite is still pending"""
+        with self.lock:
+            if self.pending is not None:
+                return False
+            append_history_entry(entry)
+            return True
+
+    def clear(self):
+        """Drop any pending snapshot and truncate the file"""
+        with self.lock:
+            self.pending = None
+            open(HISTORY_FILE, "wb").close()
+
+    def flush(self):
+        """Write the pending snapshot, if any"""
+        with self.lock:
+            if self.pending is not None:
+                history, favorites = self.pending
+                self.pending = None
+                write_history_data(history, favorites)
+
+    def run(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            # Let a burst of changes land so they go out in one write
+            time.sleep(WRITE_DELAY)
+            try:
+                self.flush()
+            except Exception:
+                logging.getLogger(__name__).exception("Error saving history to file")
+
+@st.cache_resource
+def get_history_writer():
+    """One history writer (and thread) per process"""
+    return HistoryWriter()
+
+def mark_history_dirty():
+    """Flag history as changed without writing it to disk yet"""
+    st.session_state["history_dirty"] = True
+    get_history_writer().defer(st.session_state["history"], st.session_state["favorites"])
+
 def save_history():
-    """Save history to persistent storage"""
-    return save_history_to_file()
+    """Queue unsaved history changes for the background writer"""
+    if not st.session_state["history_dirty"]:
+        return True
+    get_history_writer().schedule(st.session_state["history"], st.session_state["favorites"])
+    st.session_state["history_dirty"] = False
+    st.session_state["last_save_ts"] = time.time()
+    return True
+
+def save_new_history_entry():
+    """Persist the newest entry, appending it when there are no other unsaved changes"""
+    if not st.session_state["history_dirty"] and os.path.exists(HISTORY_FILE):
+        try:
+            if get_history_writer().append(st.session_state["history"][-1]):
+                return True
+        except Exception as e:
+            st.error(f"Error saving history to file: {e}")
+            return False
+    mark_history_dirty()
+    return save_history()
+
+def flush_history_if_due():
+    """Save deferred changes once SAVE_INTERVAL has passed since the last write"""
+    if (st.session_state["history_dirty"] and
+            time.time() - st.session_state["last_save_ts"] >= SAVE_INTERVAL):
+        save_history()
+
+def trim_history():
+    """Drop the oldest entries beyond MAX_HISTORY; returns True if any were removed"""
+    history = st.session_state["history"]
+    excess = len(history) - MAX_HISTORY
+    if excess <= 0:
+        return False
+    st.session_state["history"] = history[excess:]
+    st.session_state["favorites"].difference_update(row["id"] for row in history[:excess])
+    mark_history_dirty()
+    return True
 
 def load_history():
     """Load history from persistent storage"""
@@ -52,108 +251,100 @@ def load_history():
 
 # ----------------- MODEL LOADING ----------------- #
 model_path = "best_model.pkl"
-if not os.path.exists(model_path):
-    st.warning("⚠️ Model file 'best_model.pkl' not found. Using enhanced fallback prediction model.")
-    class FallbackModel:
-        def predict(self, X):
-            study_hours, attendance, mental_health, sleep_hours, part_time_job = X[0]
+
+class FallbackModel:
+    def predict(self, X):
+        # Columns of an (N, 5) batch; every impact below is computed for all rows at once.
+        # A single 1-D row of 5 features is treated as a batch of one.
+        study_hours, attendance, mental_health, sleep_hours, part_time_job = np.atleast_2d(
+            np.asarray(X, dtype=float)).T
+        
+        # Base score calculation with realistic factors
+        base_score = 40  # Base score for average student
+        
+        # Study hours impact (realistic scaling)
+        study_impact = np.select(
+            [study_hours <= 1, study_hours <= 2, study_hours <= 4, study_hours <= 6],
+            [-15, -5, study_hours * 3, 12 + (study_hours - 4) * 2],
+            default=16 + (study_hours - 6) * 1
+        )
             
-            # Base score calculation with realistic factors
-            base_score = 40  # Base score for average student
+        # Attendance impact
+        attendance_impact = np.select(
+            [attendance < 60, attendance < 75, attendance < 90],
+            [-20, (attendance - 60) * 0.8, 12 + (attendance - 75) * 1.2],
+            default=30 + (attendance - 90) * 0.5
+        )
             
-            # Study hours impact (realistic scaling)
-            study_impact = 0
-            if study_hours <= 1:
-                study_impact = -15
-            elif study_hours <= 2:
-                study_impact = -5
-            elif study_hours <= 4:
-                study_impact = study_hours * 3
-            elif study_hours <= 6:
-                study_impact = 12 + (study_hours - 4) * 2
-            else:
-                study_impact = 16 + (study_hours - 6) * 1
-                
-            # Attendance impact
-            attendance_impact = 0
-            if attendance < 60:
-                attendance_impact = -20
-            elif attendance < 75:
-                attendance_impact = (attendance - 60) * 0.8
-            elif attendance < 90:
-                attendance_impact = 12 + (attendance - 75) * 1.2
-            else:
-                attendance_impact = 30 + (attendance - 90) * 0.5
-                
-            # Mental health impact
-            mental_impact = 0
-            if mental_health <= 3:
-                mental_impact = -15
-            elif mental_health <= 5:
-                mental_impact = (mental_health - 3) * 2.5
-            elif mental_health <= 8:
-                mental_impact = 5 + (mental_health - 5) * 3
-            else:
-                mental_impact = 14 + (mental_health - 8) * 2
-                
-            # Sleep hours impact
-            sleep_impact = 0
-            if sleep_hours < 5:
-                sleep_impact = -20
-            elif sleep_hours < 6:
-                sleep_impact = -10
-            elif sleep_hours < 7:
-                sleep_impact = -5
-            elif sleep_hours <= 8:
-                sleep_impact = 10
-            elif sleep_hours <= 9:
-                sleep_impact = 5
-            else:
-                sleep_impact = -5
-                
-            # Part-time job impact
-            job_impact = -12 if part_time_job == 1 else 5
+        # Mental health impact
+        mental_impact = np.select(
+            [mental_health <= 3, mental_health <= 5, mental_health <= 8],
+            [-15, (mental_health - 3) * 2.5, 5 + (mental_health - 5) * 3],
+            default=14 + (mental_health - 8) * 2
+        )
             
-            # Calculate final score
-            final_score = (base_score + study_impact + attendance_impact + 
-                         mental_impact + sleep_impact + job_impact)
+        # Sleep hours impact
+        sleep_impact = np.select(
+            [sleep_hours < 5, sleep_hours < 6, sleep_hours < 7, sleep_hours <= 8, sleep_hours <= 9],
+            [-20, -10, -5, 10, 5],
+            default=-5
+        )
             
-            return max(0, min(100, final_score))
-    
-    model = FallbackModel()
-    model_name = "Enhanced Fallback Model"
-else:
+        # Part-time job impact
+        job_impact = np.where(part_time_job == 1, -12, 5)
+        
+        # Calculate final score
+        final_score = (base_score + study_impact + attendance_impact + 
+                     mental_impact + sleep_impact + job_impact)
+        
+        return np.clip(final_score, 0, 100)
+
+class LinearScorer:
+    """A fitted linear regression reduced to its coefficients: predict() is one dot product,
+    without scikit-learn's per-call input validation"""
+    def __init__(self, coef, intercept):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    def predict(self, X):
+        return np.atleast_2d(X) @ self.coef + self.intercept
+
+@st.cache_resource
+def get_model(path):
+    """Load the model once per process and reuse it across reruns; returns (model, model_name)"""
+    if not os.path.exists(path):
+        st.warning("⚠️ Model file 'best_model.pkl' not found. Using enhanced fallback prediction model.")
+        return FallbackModel(), "Enhanced Fallback Model"
     try:
-        model = joblib.load(model_path)
-        model_name = type(model).__name__
+        import joblib  # imported on demand: only needed the first time the model loads
+        model = joblib.load(path)
     except:
         st.warning("⚠️ Error loading model. Using enhanced fallback prediction.")
-        model = FallbackModel()
-        model_name = "Enhanced Fallback Model"
+        return FallbackModel(), "Enhanced Fallback Model"
+    model_name = type(model).__name__
+    if model_name == "LinearRegression" and np.shape(model.coef_) == (5,):
+        return LinearScorer(model.coef_, model.intercept_), model_name
+    return model, model_name
 
-# ----------------- SESSION STATE ----------------- #
-if "history" not in st.session_state:
-    st.session_state["history"] = []
-if "prediction" not in st.session_state:
-    st.session_state["prediction"] = None
-if "show_history" not in st.session_state:
-    st.session_state["show_history"] = False
-if "prediction_made" not in st.session_state:
-    st.session_state["prediction_made"] = False
-if "favorites" not in st.session_state:
-    st.session_state["favorites"] = []
-if "analyze_config" not in st.session_state:
-    st.session_state["analyze_config"] = None
-if "displayed_prediction" not in st.session_state:
-    st.session_state["displayed_prediction"] = False
-if "persistent_loaded" not in st.session_state:
-    st.session_state["persistent_loaded"] = False
+model, model_name = get_model(model_path)
 
-# Load persistent data on first run
-if not st.session_state["persistent_loaded"]:
-    if load_history():
-        st.success("📁 Loaded previous session data!")
-    st.session_state["persistent_loaded"] = True
+# ----------------- SESSION STATE ----------------- #
+SESSION_DEFAULTS = {
+    "history": [],
+    "prediction": None,
+    "show_history": False,
+    "prediction_made": False,
+    "favorites": set(),  # ids of favorite history entries
+    "analyze_config": None,
+    "displayed_prediction": False,
+    "persistent_loaded": False,
+    "history_dirty": False,
+    "last_save_ts": 0.0,
+    "comparison_options": None  # (history list, labels) cached by comparison_options()
+}
+for k, v in SESSION_DEFAULTS.items():
+    # Copy so sessions never share the default list/set objects
+    st.session_state.setdefault(k, copy.copy(v))
 
 # ----------------- DEFAULT VALUES ----------------- #
 defaults = {
@@ -163,135 +354,263 @@ defaults = {
     "sleep_hours": 7.0,
     "part_time_job": "No"
 }
+# These are also the profile form's widget keys
+for k, v in defaults.items():
+    st.session_state.setdefault(k, v)
+
+HISTORY_COLUMNS = ["Study Hours", "Attendance", "Mental Health", "Sleep Hours",
+                   "Part-time Job", "Predicted Score", "Timestamp", "Study Profile"]
+PROFILE_LABELS = ["🎯 High Performer", "⚡ Balanced Student", "💪 Needs Support"]
+# (predicate, message) tables evaluated column-wise by rule_masks()
+STUDY_TIPS = [
+    (lambda d: d["Study Hours"] < 2, "📚 **Increase study hours** to at least 2-3 hours daily"),
+    (lambda d: d["Study Hours"] > 6, "📚 **Balance study time** - avoid burnout"),
+    (lambda d: d["Attendance"] < 75, "🏫 **Improve attendance** - aim for at least 75%"),
+    (lambda d: d["Mental Health"] < 5, "🧠 **Focus on mental wellbeing** - take breaks and manage stress"),
+    (lambda d: d["Sleep Hours"] < 6, "💤 **Get more sleep** - aim for 7-8 hours"),
+    (lambda d: d["Sleep Hours"] > 9, "💤 **Maintain consistent sleep** - 7-8 hours is optimal"),
+    (lambda d: (d["Part-time Job"] == "Yes") & (d["Study Hours"] > 4),
+     "💼 **Balance work and study** - consider reducing hours during exams"),
+]
+GOOD_HABITS = [
+    (lambda d: d["Study Hours"] >= 3, "Good study routine ({Study Hours}h daily)"),
+    (lambda d: d["Attendance"] >= 80, "Solid attendance ({Attendance}%)"),
+    (lambda d: d["Mental Health"] >= 6, "Decent mental health ({Mental Health}/10)"),
+    (lambda d: (d["Sleep Hours"] >= 7) & (d["Sleep Hours"] <= 8), "Good sleep habits ({Sleep Hours}h)"),
+    (lambda d: d["Part-time Job"] == "No", "No part-time job distraction"),
+]
+# Rows of the comparison table: history column, row label, value format
+COMPARISON_FACTORS = (
+    ("Study Hours", "Study Hours", "{}h"),
+    ("Attendance", "Attendance", "{}%"),
+    ("Mental Health", "Mental Health", "{}/10"),
+    ("Sleep Hours", "Sleep", "{}h"),
+    ("Part-time Job", "Part-time Job", "{}"),
+    ("Predicted Score", "Score", "{:.1f}%"),
+)
+# Comparison summary tiers, first match wins: (minimum score gap, direction of the second
+# profile, alert, headline, key differences); smaller gaps count as similar performance
+COMPARISON_TIERS = (
+    (5, 1, st.success, "**Profile {second} scores {gap:.1f}% higher**",
+     "**Key differences:** Profile {second} has better study habits or attendance"),
+    (5, -1, st.warning, "**Profile {second} scores {gap:.1f}% lower**",
+     "**Key differences:** Profile {first} has better factors"),
+)
+# Pulls a history entry's comparison values out as a tuple in one call
+comparison_values = operator.itemgetter(*(column for column, _, _ in COMPARISON_FACTORS))
+
+# Score bands: below 50, 75, 85 and 95, then 95 and above
+SCORE_EDGES = (50, 75, 85, 95)
+SCORE_COLORS = ("#ff4b4b", "#ffa500", "#4caf50", "#2196f3", "#9c27b0")
+SCORE_LABELS = ("Needs Improvement", "Moderate", "Good", "Excellent", "Outstanding")
+# Array copies for looking up whole columns of scores at once
+SCORE_EDGE_ARRAY = np.array(SCORE_EDGES)
+SCORE_COLOR_ARRAY = np.array(SCORE_COLORS)
+SCORE_LABEL_ARRAY = np.array(SCORE_LABELS)
+
+# ----------------- HTML TEMPLATES ----------------- #
+# Static blocks are built once at import instead of on every rerun
+TITLE_HTML = "<h1 style='text-align:center; color:#00b4d8;'>📊 Student Exam Score Predictor</h1>"
+PROFILE_HEADER_HTML = "<h3 style='color:#00b4d8;'>📝 Student Profile</h3>"
+DASHBOARD_HEADER_HTML = "<h3 style='color:#00b4d8;'>📊 Dashboard</h3>"
+TIPS_HEADER_HTML = "<h3 style='color:#00b4d8;'>💡 Quick Tips</h3>"
+
+BANNER_HTML = """
+<div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+            padding: 20px; border-radius: 15px; margin-bottom: 20px;'>
+    <h2 style='color: white; text-align: center; margin: 0;'>{title}</h2>
+</div>
+"""
+
+# Score cards; doubled braces are literal CSS braces
+COUNTUP_SCORE_HTML = """
+<style>
+    @property --score {{ syntax: '<integer>'; initial-value: 0; inherits: false; }}
+    @keyframes score-countup {{ from {{ --score: 0; }} to {{ --score: {score}; }} }}
+    .score-countup {{ animation: score-countup 1s ease-out forwards; counter-reset: score var(--score); }}
+    .score-countup::after {{ content: counter(score) '%'; }}
+</style>
+<div style='text-align:center; padding:30px; margin-top:10px; border-radius:15px;
+            background: linear-gradient(135deg, #1f1f2e, #2e2e3e);
+            box-shadow: 0 0 20px {color}, 0 0 40px {color};
+            color:white; position:relative; min-height:120px'>
+    <h1 class='score-countup' style='color:{color}; text-shadow: 0 0 15px {color}, 0 0 30px {color}; font-size:48px; font-weight:bold'></h1>
+    <h3 style='color:{color}; margin-top:10px;'>{feedback}</h3>
+</div>
+"""
+
+STATIC_SCORE_HTML = """
+<div style='text-align:center; padding:30px; margin-top:10px; border-radius:15px;
+            background: linear-gradient(135deg, #1f1f2e, #2e2e3e);
+            box-shadow: 0 0 20px {color}, 0 0 40px {color};
+            color:white; position:relative; min-height:120px'>
+    <h1 style='color:{color}; text-shadow: 0 0 15px {color}, 0 0 30px {color}; font-size:48px; font-weight:bold'>
+        {score:.1f}%
+    </h1>
+    <h3 style='color:{color}; margin-top:10px;'>{feedback}</h3>
+</div>
+"""
+
+DASHBOARD_CARD_HTML = """
+<div style='background:#2e2e3e; border-radius:12px; padding:10px; margin-bottom:8px;
+            box-shadow: 0 0 10px #00b4d8, 0 0 15px #00b4d8; text-align:center;'>
+    <h5 style='color:#00b4d8; margin:0'>{label}</h5>
+    <p style='font-size:18px; color:white; font-weight:bold; margin:0'>{value}</p>
+</div>
+"""
+
+# Analysis view cards
+FACTOR_ROW_HTML = """
+<div style='background: rgba(255,255,255,0.05); padding: 10px; border-radius: 8px; margin: 5px 0;'>
+    <div style='display: flex; justify-content: between; align-items: center;'>
+        <span style='color: white; font-weight: bold;'>{factor}</span>
+        <span style='color: white;'>{value}</span>
+        <span>{status}</span>
+    </div>
+    <div style='color: #888; font-size: 12px;'>{optimal}</div>
+</div>
+"""
+
+ANALYSIS_SCORE_HTML = """
+<div style='text-align: center; padding: 20px; background: rgba(255,255,255,0.05); border-radius: 10px;'>
+    <div style='color: {color}; font-size: 48px; font-weight: bold;'>
+        {score:.1f}%
+    </div>
+    <div style='color: {color}; font-size: 16px;'>
+        {feedback}
+    </div>
+</div>
+"""
+
+ANALYSIS_PROFILE_HTML = """
+<div style='text-align: center; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 10px; margin-top: 10px;'>
+    <div style='color: #00b4d8; font-weight: bold;'>{profile}</div>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style='text-align:center; color:#888;'>
+    <p>👨‍💻 Developed by Ujwal | 📊 Student Performance Predictor</p>
+    <p style='font-size: 12px;'>💾 History is automatically saved and will persist between sessions</p>
+</div>
+"""
+
+FAVORITE_CARD_HTML = """
+<div style='display: flex; justify-content: space-between; align-items: center; padding: 15px;
+            background: rgba(255,215,0,0.1); border-radius: 10px; margin: 10px 0; border: 2px solid #FFD700;'>
+    <div>
+        <div style='color: #FFD700; font-weight: bold;'>{profile}</div>
+        <div style='color: white; font-size: 14px;'>
+            📚 {study_hours}h • 🏫 {attendance}% • 🧠 {mental_health}/10
+        </div>
+    </div>
+    <div style='color: {color}; font-weight: bold; font-size: 20px;'>{score:.1f}%</div>
+</div>
+"""
 
 # ----------------- HELPER FUNCTIONS ----------------- #
 def glow_color(score):
-    if score < 50: return "#ff4b4b"
-    elif score < 75: return "#ffa500"
-    elif score < 85: return "#4caf50"
-    elif score < 95: return "#2196f3"
-    else: return "#9c27b0"
+    """Glow color for a score, or an array of colors for a column of scores"""
+    if np.ndim(score):
+        return SCORE_COLOR_ARRAY[np.searchsorted(SCORE_EDGE_ARRAY, score, side="right")]
+    # Single scores skip numpy's per-call overhead
+    return SCORE_COLORS[bisect.bisect_right(SCORE_EDGES, score)]
 
 def feedback_text(score):
-    if score < 50: return "Needs Improvement"
-    elif score < 75: return "Moderate"
-    elif score < 85: return "Good"
-    elif score < 95: return "Excellent"
-    else: return "Outstanding"
+    """Feedback label for a score, or an array of labels for a column of scores"""
+    if np.ndim(score):
+        return SCORE_LABEL_ARRAY[np.searchsorted(SCORE_EDGE_ARRAY, score, side="right")]
+    return SCORE_LABELS[bisect.bisect_right(SCORE_EDGES, score)]
+
+def rule_masks(rules, columns):
+    """Boolean matrix (rules x rows) of which rules hold; columns may hold scalars or whole arrays"""
+    return np.stack([np.asarray(applies(columns)) for applies, _ in rules])
+
+def matching_messages(rules, columns):
+    """Messages of the rules that hold for a single student, filled with their values"""
+    masks = rule_masks(rules, columns)
+    return [message.format_map(columns) for (_, message), applies in zip(rules, masks) if applies]
 
 def get_study_tips(score, study_hours, attendance, mental_health, sleep_hours, part_time_job):
-    tips = []
-    if study_hours < 2:
-        tips.append("📚 **Increase study hours** to at least 2-3 hours daily")
-    elif study_hours > 6:
-        tips.append("📚 **Balance study time** - avoid burnout")
-    if attendance < 75:
-        tips.append("🏫 **Improve attendance** - aim for at least 75%")
-    if mental_health < 5:
-        tips.append("🧠 **Focus on mental wellbeing** - take breaks and manage stress")
-    if sleep_hours < 6:
-        tips.append("💤 **Get more sleep** - aim for 7-8 hours")
-    elif sleep_hours > 9:
-        tips.append("💤 **Maintain consistent sleep** - 7-8 hours is optimal")
-    if part_time_job == "Yes" and study_hours > 4:
-        tips.append("💼 **Balance work and study** - consider reducing hours during exams")
+    """Tips for one set of inputs"""
+    tips = matching_messages(STUDY_TIPS, {
+        "Study Hours": study_hours,
+        "Attendance": attendance,
+        "Mental Health": mental_health,
+        "Sleep Hours": sleep_hours,
+        "Part-time Job": part_time_job
+    })
     if not tips:
         tips.append("🎯 **Maintain your current habits** - you're on the right track!")
-    return tips
+    return tuple(tips)
 
 def get_study_profile(study_hours, attendance, mental_health, sleep_hours, part_time_job):
-    if (study_hours >= 4 and attendance >= 90 and mental_health >= 8 and 
-        7 <= sleep_hours <= 8 and part_time_job == "No"):
-        return "🎯 High Performer"
-    elif (study_hours >= 3 and attendance >= 80 and mental_health >= 6):
-        return "⚡ Balanced Student"
-    elif (study_hours < 2 or attendance < 70 or mental_health < 4):
-        return "💪 Needs Support"
-    else:
-        return "📊 Average Performer"
+    """Classify a student, or whole history columns at once, into a study profile"""
+    study_hours = np.asarray(study_hours)
+    attendance = np.asarray(attendance)
+    mental_health = np.asarray(mental_health)
+    sleep_hours = np.asarray(sleep_hours)
+    part_time_job = np.asarray(part_time_job)
+    conditions = [
+        (study_hours >= 4) & (attendance >= 90) & (mental_health >= 8) &
+        (sleep_hours >= 7) & (sleep_hours <= 8) & (part_time_job == "No"),
+        (study_hours >= 3) & (attendance >= 80) & (mental_health >= 6),
+        (study_hours < 2) | (attendance < 70) | (mental_health < 4),
+    ]
+    profiles = np.select(conditions, PROFILE_LABELS, default="📊 Average Performer")
+    return profiles.item() if profiles.ndim == 0 else profiles
+
+def backfill_study_profiles(history):
+    """One-time migration: store a Study Profile on entries saved without one"""
+    missing = [row for row in history if "Study Profile" not in row]
+    if missing:
+        frame = history_frame(missing)
+        profiles = get_study_profile(frame["Study Hours"], frame["Attendance"], frame["Mental Health"],
+                                     frame["Sleep Hours"], frame["Part-time Job"])
+        for row, profile in zip(missing, profiles.tolist()):
+            row["Study Profile"] = profile
+
+def backfill_entry_ids(history, favorites):
+    """One-time migration: give entries a stable id and return the favorites as a set of ids"""
+    for row in history:
+        if "id" not in row:
+            row["id"] = uuid.uuid4().hex
+    # Favorites saved before version 3 are history indices
+    return {
+        history[fav]["id"] if isinstance(fav, int) else fav
+        for fav in favorites
+        if not isinstance(fav, int) or fav < len(history)
+    }
+
+def format_timestamp(timestamp):
+    """Display form of an entry Timestamp (epoch seconds, or a preformatted string in older files)"""
+    if isinstance(timestamp, str):
+        return timestamp
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def history_frame(records=None):
+    """Columnar view of history records (all of history by default) for vectorized computations"""
+    import pandas as pd  # imported on demand to keep cold starts fast
+    if records is None:
+        records = st.session_state["history"]
+    return pd.DataFrame.from_records(records, columns=HISTORY_COLUMNS)
 
 def display_countup_score(prediction):
-    """Display score with countup animation"""
-    color = glow_color(prediction)
-    feedback = feedback_text(prediction)
-    placeholder = st.empty()
-    step = max(1, int(prediction / 50))
-    
-    for i in range(0, int(prediction) + 1, step):
-        html_content = f"""
-        <div style='text-align:center; padding:30px; margin-top:10px; border-radius:15px;
-                    background: linear-gradient(135deg, #1f1f2e, #2e2e3e);
-                    box-shadow: 0 0 20px {color}, 0 0 40px {color};
-                    color:white; position:relative; min-height:120px'>
-            <h1 style='color:{color}; text-shadow: 0 0 15px {color}, 0 0 30px {color}; font-size:48px; font-weight:bold'>
-                {i:.0f}%
-            </h1>
-            <h3 style='color:{color}; margin-top:10px;'>{feedback}</h3>
-        </div>
-        """
-        placeholder.markdown(html_content, unsafe_allow_html=True)
-        time.sleep(0.02)
+    """Display score with a count-up animation run by the browser"""
+    # A CSS counter animated through a registered custom property replaces the
+    # old server-side loop that re-rendered the card 50 times with sleeps
+    st.markdown(COUNTUP_SCORE_HTML.format(
+        score=int(prediction), color=glow_color(prediction), feedback=feedback_text(prediction)
+    ), unsafe_allow_html=True)
     
     # Mark as displayed
     st.session_state["displayed_prediction"] = True
 
 def display_static_score(prediction):
     """Display static score (for already shown predictions)"""
-    color = glow_color(prediction)
-    feedback = feedback_text(prediction)
-    st.markdown(f"""
-    <div style='text-align:center; padding:30px; margin-top:10px; border-radius:15px;
-                background: linear-gradient(135deg, #1f1f2e, #2e2e3e);
-                box-shadow: 0 0 20px {color}, 0 0 40px {color};
-                color:white; position:relative; min-height:120px'>
-        <h1 style='color:{color}; text-shadow: 0 0 15px {color}, 0 0 30px {color}; font-size:48px; font-weight:bold'>
-            {prediction:.1f}%
-        </h1>
-        <h3 style='color:{color}; margin-top:10px;'>{feedback}</h3>
-    </div>
-    """, unsafe_allow_html=True)
-
-def create_progress_chart(score):
-    fig = go.Figure()
-    fig.add_trace(go.Indicator(
-        mode = "gauge+number",
-        value = score,
-        number = {'suffix': "%", 'font': {'size': 40}},
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        gauge = {
-            'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "white"},
-            'bar': {'color': glow_color(score), 'thickness': 0.3},
-            'bgcolor': "rgba(0,0,0,0)",
-            'borderwidth': 2,
-            'bordercolor': "white",
-            'steps': [
-                {'range': [0, 50], 'color': 'rgba(255, 75, 75, 0.2)'},
-                {'range': [50, 75], 'color': 'rgba(255, 165, 0, 0.2)'},
-                {'range': [75, 85], 'color': 'rgba(76, 175, 80, 0.2)'},
-                {'range': [85, 95], 'color': 'rgba(33, 150, 243, 0.2)'},
-                {'range': [95, 100], 'color': 'rgba(156, 39, 176, 0.2)'}],
-        }
-    ))
-    fig.update_layout(
-        height=300,
-        margin=dict(l=50, r=50, t=50, b=50),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font={'color': "white", 'family': "Arial"}
-    )
-    return fig
-
-def add_timestamp_to_history():
-    if st.session_state["history"]:
-        st.session_state["history"][-1]["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        st.session_state["history"][-1]["Study Profile"] = get_study_profile(
-            st.session_state["history"][-1]["Study Hours"],
-            st.session_state["history"][-1]["Attendance"],
-            st.session_state["history"][-1]["Mental Health"],
-            st.session_state["history"][-1]["Sleep Hours"],
-            st.session_state["history"][-1]["Part-time Job"]
-        )
-        # Save to persistent storage after adding new entry
-        save_history()
+    st.markdown(STATIC_SCORE_HTML.format(
+        score=prediction, color=glow_color(prediction), feedback=feedback_text(prediction)
+    ), unsafe_allow_html=True)
 
 def show_simple_analysis(idx):
     """Show simple and understandable analysis for a specific history entry"""
@@ -300,12 +619,7 @@ def show_simple_analysis(idx):
     
     row = st.session_state["history"][idx]
     
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                padding: 20px; border-radius: 15px; margin-bottom: 20px;'>
-        <h2 style='color: white; text-align: center; margin: 0;'>🔍 Quick Analysis</h2>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(BANNER_HTML.format(title="🔍 Quick Analysis"), unsafe_allow_html=True)
     
     # Score Overview
     col1, col2 = st.columns([2, 1])
@@ -334,66 +648,36 @@ def show_simple_analysis(idx):
             elif factor == "💤 Sleep Hours":
                 status = "🟢 Good" if 7 <= value <= 8 else "🟡 Okay" if 6 <= value <= 9 else "🔴 Improve"
             
-            st.markdown(f"""
-            <div style='background: rgba(255,255,255,0.05); padding: 10px; border-radius: 8px; margin: 5px 0;'>
-                <div style='display: flex; justify-content: between; align-items: center;'>
-                    <span style='color: white; font-weight: bold;'>{factor}</span>
-                    <span style='color: white;'>{value}</span>
-                    <span>{status}</span>
-                </div>
-                <div style='color: #888; font-size: 12px;'>{optimal}</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(FACTOR_ROW_HTML.format(
+                factor=factor, value=value, status=status, optimal=optimal
+            ), unsafe_allow_html=True)
     
     with col2:
         # Score Display
-        score_color = glow_color(row['Predicted Score'])
-        st.markdown(f"""
-        <div style='text-align: center; padding: 20px; background: rgba(255,255,255,0.05); border-radius: 10px;'>
-            <div style='color: {score_color}; font-size: 48px; font-weight: bold;'>
-                {row['Predicted Score']:.1f}%
-            </div>
-            <div style='color: {score_color}; font-size: 16px;'>
-                {feedback_text(row['Predicted Score'])}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(ANALYSIS_SCORE_HTML.format(
+            score=row['Predicted Score'], color=glow_color(row['Predicted Score']),
+            feedback=feedback_text(row['Predicted Score'])
+        ), unsafe_allow_html=True)
         
         # Study Profile
-        profile = get_study_profile(row['Study Hours'], row['Attendance'], row['Mental Health'], row['Sleep Hours'], row['Part-time Job'])
-        st.markdown(f"""
-        <div style='text-align: center; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 10px; margin-top: 10px;'>
-            <div style='color: #00b4d8; font-weight: bold;'>{profile}</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(ANALYSIS_PROFILE_HTML.format(profile=row['Study Profile']), unsafe_allow_html=True)
 
     # Quick Tips
     st.markdown("### 💡 Quick Tips to Improve")
     tips = get_study_tips(row['Predicted Score'], row['Study Hours'], row['Attendance'], 
                          row['Mental Health'], row['Sleep Hours'], row['Part-time Job'])
     
-    for tip in tips[:3]:  # Show only top 3 tips
-        st.markdown(f"• {tip}")
+    # Only the top 3 tips, as one markdown element
+    st.markdown("\n".join(f"- {tip}" for tip in tips[:3]))
 
     # What's Working Well
     st.markdown("### ✅ What's Working Well")
-    good_points = []
-    if row['Study Hours'] >= 3:
-        good_points.append(f"Good study routine ({row['Study Hours']}h daily)")
-    if row['Attendance'] >= 80:
-        good_points.append(f"Solid attendance ({row['Attendance']}%)")
-    if row['Mental Health'] >= 6:
-        good_points.append(f"Decent mental health ({row['Mental Health']}/10)")
-    if 7 <= row['Sleep Hours'] <= 8:
-        good_points.append(f"Good sleep habits ({row['Sleep Hours']}h)")
-    if row['Part-time Job'] == "No":
-        good_points.append("No part-time job distraction")
+    good_points = matching_messages(GOOD_HABITS, row)
     
     if good_points:
-        for point in good_points[:3]:  # Show only top 3 good points
-            st.markdown(f"• {point}")
+        st.markdown("\n".join(f"- {point}" for point in good_points[:3]))  # Show only top 3 good points
     else:
-        st.markdown("• Keep working on building good habits!")
+        st.markdown("- Keep working on building good habits!")
 
     # Close Analysis Button
     if st.button("🔙 Back to History", use_container_width=True):
@@ -401,117 +685,119 @@ def show_simple_analysis(idx):
         st.rerun()
 
 def show_predictions_table():
-    """Show predictions with delete option"""
-    for idx, row in enumerate(st.session_state["history"]):
-        with st.container():
-            col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
-            
-            with col1:
-                profile = row.get('Study Profile', get_study_profile(
-                    row['Study Hours'], row['Attendance'], row['Mental Health'], 
-                    row['Sleep Hours'], row['Part-time Job']
-                ))
-                st.markdown(f"""
-                <div style='padding: 10px; background: rgba(255,255,255,0.05); border-radius: 8px; margin: 5px 0;'>
-                    <div style='color: #00b4d8; font-weight: bold;'>{profile}</div>
-                    <div style='color: white; font-size: 12px;'>
-                        📚 {row['Study Hours']}h • 🏫 {row['Attendance']}% • 🧠 {row['Mental Health']}/10
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                score_color = glow_color(row['Predicted Score'])
-                st.markdown(f"""
-                <div style='text-align: center; padding: 10px;'>
-                    <div style='color: {score_color}; font-weight: bold; font-size: 18px;'>
-                        {row['Predicted Score']:.1f}%
-                    </div>
-                    <div style='color: #888; font-size: 12px;'>{feedback_text(row['Predicted Score'])}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                is_favorite = idx in st.session_state["favorites"]
-                button_text = "🌟" if is_favorite else "⭐"
-                if st.button(button_text, key=f"fav_{idx}", help="Add to favorites"):
-                    if is_favorite:
-                        st.session_state["favorites"].remove(idx)
-                    else:
-                        st.session_state["favorites"].append(idx)
-                    save_history()
-                    st.rerun()
-            
-            with col4:
-                if st.button("📊", key=f"analyze_{idx}", help="View detailed analysis"):
-                    st.session_state["analyze_config"] = idx
-                    st.rerun()
-            
-            with col5:
-                if st.button("🗑️", key=f"delete_{idx}", help="Delete this entry"):
-                    # Remove from history
-                    st.session_state["history"].pop(idx)
-                    # Remove from favorites if present
-                    if idx in st.session_state["favorites"]:
-                        st.session_state["favorites"].remove(idx)
-                    # Adjust other favorites indices
-                    st.session_state["favorites"] = [
-                        fav_idx if fav_idx < idx else fav_idx - 1 
-                        for fav_idx in st.session_state["favorites"]
-                    ]
-                    save_history()
-                    st.rerun()
+    """Show all predictions in one editable table with favorite, analyze and delete actions"""
+    # Every entry carries its Study Profile (set on insert, backfilled on load)
+    frame = history_frame()
+    labels = feedback_text(frame["Predicted Score"])
+    favorites = st.session_state["favorites"]
+    
+    table = frame[["Study Profile", "Study Hours", "Attendance", "Mental Health", "Predicted Score"]].assign(
+        Feedback=labels,
+        Favorite=[row["id"] in favorites for row in st.session_state["history"]],
+        Analyze=False,
+        Delete=False,
+    )
+    edited = st.data_editor(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        disabled=["Study Profile", "Study Hours", "Attendance", "Mental Health", "Predicted Score", "Feedback"],
+        column_config={
+            "Study Hours": st.column_config.NumberColumn("📚 Study", format="%.1fh"),
+            "Attendance": st.column_config.NumberColumn("🏫 Attendance", format="%d%%"),
+            "Mental Health": st.column_config.NumberColumn("🧠 Mental", format="%d/10"),
+            "Predicted Score": st.column_config.ProgressColumn(
+                "Score", format="%.1f%%", min_value=0, max_value=100
+            ),
+            "Favorite": st.column_config.CheckboxColumn("⭐", help="Add to favorites"),
+            "Analyze": st.column_config.CheckboxColumn("📊", help="View detailed analysis"),
+            "Delete": st.column_config.CheckboxColumn("🗑️", help="Delete this entry"),
+        },
+    )
+    # App-scoped rerun: analysis replaces the whole page, not just the history panel
+    if apply_history_edits(edited):
+        st.rerun()
+
+def apply_history_edits(edited):
+    """Apply the favorite/analyze/delete edits from the history table in one pass"""
+    history = st.session_state["history"]
+    to_analyze = edited.index[edited["Analyze"]].tolist()
+    if to_analyze:
+        st.session_state["analyze_config"] = to_analyze[0]
+        return True
+    
+    # Favorites and deletes are tracked by entry id, so no index fixups are needed
+    checked = {history[idx]["id"] for idx in edited.index[edited["Favorite"]]}
+    to_delete = {history[idx]["id"] for idx in edited.index[edited["Delete"]]}
+    if checked == st.session_state["favorites"] and not to_delete:
+        return False
+    
+    if to_delete:
+        st.session_state["history"] = [row for row in history if row["id"] not in to_delete]
+    st.session_state["favorites"] = checked - to_delete
+    mark_history_dirty()
+    return True
 
 def show_favorites_section():
-    if st.session_state["favorites"]:
+    favorites = st.session_state["favorites"]
+    favorite_rows = [row for row in st.session_state["history"] if row["id"] in favorites]
+    if favorite_rows:
         st.markdown("### ⭐ Favorite Study Profiles")
-        for fav_idx, idx in enumerate(st.session_state["favorites"]):
-            if idx < len(st.session_state["history"]):
-                row = st.session_state["history"][idx]
-                with st.container():
-                    col1, col2, col3 = st.columns([3, 2, 1])
-                    with col1:
-                        st.markdown(f"""
-                        <div style='padding: 15px; background: rgba(255,215,0,0.1); border-radius: 10px; margin: 10px 0; border: 2px solid #FFD700;'>
-                            <div style='color: #FFD700; font-weight: bold;'>{get_study_profile(row['Study Hours'], row['Attendance'], row['Mental Health'], row['Sleep Hours'], row['Part-time Job'])}</div>
-                            <div style='color: white; font-size: 14px;'>
-                                📚 {row['Study Hours']}h • 🏫 {row['Attendance']}% • 🧠 {row['Mental Health']}/10
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col2:
-                        score_color = glow_color(row['Predicted Score'])
-                        st.markdown(f"""
-                        <div style='text-align: center; padding: 15px;'>
-                            <div style='color: {score_color}; font-weight: bold; font-size: 20px;'>
-                                {row['Predicted Score']:.1f}%
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col3:
-                        if st.button("🔄 Use", key=f"use_fav_{fav_idx}", help="Load this profile"):
-                            st.session_state["study_hours"] = row['Study Hours']
-                            st.session_state["attendance"] = row['Attendance']
-                            st.session_state["mental_health"] = row['Mental Health']
-                            st.session_state["sleep_hours"] = row['Sleep Hours']
-                            st.session_state["part_time_job"] = row['Part-time Job']
-                            st.session_state["prediction_made"] = False
-                            st.session_state["prediction"] = None
-                            st.session_state["displayed_prediction"] = False
-                            st.rerun()
+        # Colors for every favorite in one vectorized pass; profiles are stored on each entry
+        colors = glow_color(np.array([row['Predicted Score'] for row in favorite_rows]))
+        # All cards go out as one markdown element; only the "Use" controls are widgets
+        st.markdown("".join(
+            FAVORITE_CARD_HTML.format(
+                profile=row['Study Profile'], study_hours=row['Study Hours'],
+                attendance=row['Attendance'], mental_health=row['Mental Health'],
+                color=color, score=row['Predicted Score']
+            )
+            for row, color in zip(favorite_rows, colors)
+        ), unsafe_allow_html=True)
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            choice = st.selectbox(
+                "Favorite profile to load", range(len(favorite_rows)), label_visibility="collapsed",
+                format_func=lambda x: f"{favorite_rows[x]['Study Profile']} ({favorite_rows[x]['Predicted Score']:.1f}%)"
+            )
+        with col2:
+            # The callback loads the inputs; the app-wide rerun shows them in the form
+            if st.button("🔄 Use", help="Load this profile", use_container_width=True,
+                         on_click=use_favorite, args=(favorite_rows[choice],)):
+                st.rerun()
     else:
         st.info("⭐ No favorites yet. Click the star icon to add profiles to favorites.")
 
+@st.cache_data(max_entries=64)
+def build_comparison_df(label1, values1, label2, values2):
+    """Build the formatted side-by-side table for two profiles given as value tuples"""
+    import pandas as pd  # imported on demand to keep cold starts fast
+    records = [
+        (label, value_format.format(value1), value_format.format(value2))
+        for (_, label, value_format), value1, value2 in zip(COMPARISON_FACTORS, values1, values2)
+    ]
+    return pd.DataFrame.from_records(records, columns=['Factor', label1, label2])
+
+def comparison_options():
+    """Selectbox labels for the comparison tool, rebuilt only when history changes"""
+    history = st.session_state["history"]
+    cached = st.session_state["comparison_options"]
+    # History is either appended to in place or replaced by a new list
+    if cached is None or cached[0] is not history or len(cached[1]) != len(history):
+        options = [
+            f"Profile {idx+1}: {row['Predicted Score']:.1f}% ({row['Study Profile']})"
+            for idx, row in enumerate(history)
+        ]
+        cached = st.session_state["comparison_options"] = (history, options)
+    return cached[1]
+
 def show_comparison_tool():
     """Enhanced comparison tool with better insights"""
     if len(st.session_state["history"]) >= 2:
         st.markdown("### 🔍 Compare Study Profiles")
         
-        # Get profile options
-        profile_options = []
-        for idx, row in enumerate(st.session_state["history"]):
-            profile = get_study_profile(row['Study Hours'], row['Attendance'], row['Mental Health'], row['Sleep Hours'], row['Part-time Job'])
-            profile_options.append(f"Profile {idx+1}: {row['Predicted Score']:.1f}% ({profile})")
+        profile_options = comparison_options()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -523,52 +809,114 @@ def show_comparison_tool():
             row1 = st.session_state["history"][profile1_idx]
             row2 = st.session_state["history"][profile2_idx]
             
-            # Simple comparison table
-            comparison_data = {
-                'Factor': ['Study Hours', 'Attendance', 'Mental Health', 'Sleep', 'Part-time Job', 'Score'],
-                f'Profile {profile1_idx+1}': [
-                    f"{row1['Study Hours']}h", 
-                    f"{row1['Attendance']}%", 
-                    f"{row1['Mental Health']}/10", 
-                    f"{row1['Sleep Hours']}h", 
-                    row1['Part-time Job'], 
-                    f"{row1['Predicted Score']:.1f}%"
-                ],
-                f'Profile {profile2_idx+1}': [
-                    f"{row2['Study Hours']}h", 
-                    f"{row2['Attendance']}%", 
-                    f"{row2['Mental Health']}/10", 
-                    f"{row2['Sleep Hours']}h", 
-                    row2['Part-time Job'], 
-                    f"{row2['Predicted Score']:.1f}%"
-                ]
-            }
-            
-            # Create DataFrame and display
-            comparison_df = pd.DataFrame(comparison_data)
+            # Simple comparison table, cached on the (immutable) values of both rows
+            comparison_df = build_comparison_df(
+                f'Profile {profile1_idx+1}', comparison_values(row1),
+                f'Profile {profile2_idx+1}', comparison_values(row2)
+            )
             st.dataframe(comparison_df, use_container_width=True, hide_index=True)
             
             # Simple Comparison Summary
             st.markdown("### 📊 Quick Comparison")
             
             score_diff = row2['Predicted Score'] - row1['Predicted Score']
+            names = {"first": profile1_idx+1, "second": profile2_idx+1, "gap": abs(score_diff)}
             
-            if score_diff > 5:
-                st.success(f"**Profile {profile2_idx+1} scores {score_diff:.1f}% higher**")
-                st.info(f"**Key differences:** Profile {profile2_idx+1} has better study habits or attendance")
-            elif score_diff < -5:
-                st.warning(f"**Profile {profile2_idx+1} scores {abs(score_diff):.1f}% lower**")
-                st.info(f"**Key differences:** Profile {profile1_idx+1} has better factors")
+            for min_gap, direction, alert, headline, differences in COMPARISON_TIERS:
+                if score_diff * direction > min_gap:
+                    alert(headline.format(**names))
+                    st.info(differences.format(**names))
+                    break
             else:
                 st.info("**Similar performance** - minor differences in study habits")
     else:
         st.warning("📋 Need at least 2 study profiles to compare. Make more predictions to enable comparison.")
 
+def predict_score():
+    """Predict from the current inputs and add the result to history (on_click callback)"""
+    study_hours = st.session_state["study_hours"]
+    attendance = st.session_state["attendance"]
+    mental_health = st.session_state["mental_health"]
+    sleep_hours = st.session_state["sleep_hours"]
+    part_time_job = st.session_state["part_time_job"]
+    part_time_binary = 1 if part_time_job=="Yes" else 0
+    
+    # float64 matches the fitted coefficients, so there is no dtype conversion to do
+    input_data = np.array([[study_hours, attendance, mental_health, sleep_hours, part_time_binary]], dtype=np.float64)
+    # One plain float, rounded once, is stored and reused by every consumer
+    prediction = float(model.predict(input_data)[0])
+    prediction = max(0.0, min(100.0, round(prediction, 1)))
+    st.session_state["prediction"] = prediction
+    st.session_state["prediction_made"] = True
+    st.session_state["displayed_prediction"] = False
+    
+    # Add to history, complete with timestamp and profile
+    st.session_state["history"].append({
+        "id": uuid.uuid4().hex,
+        "Study Hours": study_hours,
+        "Attendance": attendance,
+        "Mental Health": mental_health,
+        "Sleep Hours": sleep_hours,
+        "Part-time Job": part_time_job,
+        "Predicted Score": prediction,
+        "Timestamp": int(time.time()),  # epoch seconds; see format_timestamp()
+        "Study Profile": get_study_profile(study_hours, attendance, mental_health,
+                                           sleep_hours, part_time_job)
+    })
+    # Save to persistent storage (flushes deferred changes too);
+    # trimming old entries turns the append into a full rewrite
+    trim_history()
+    save_new_history_entry()
+
+def use_favorite(row):
+    """Load a history entry's inputs into the profile form (on_click callback)"""
+    st.session_state.update({
+        "study_hours": float(row['Study Hours']),
+        "attendance": int(row['Attendance']),
+        "mental_health": int(row['Mental Health']),
+        "sleep_hours": float(row['Sleep Hours']),
+        "part_time_job": row['Part-time Job'],
+        "prediction_made": False,
+        "prediction": None,
+        "displayed_prediction": False,
+    })
+
+def reset_prediction():
+    """Reset inputs and prediction state (on_click callback for "Predict Again")"""
+    st.session_state.update({
+        **defaults,
+        "prediction": None,
+        "prediction_made": False,
+        "show_history": False,
+        "analyze_config": None,
+        "displayed_prediction": False,
+    })
+
+def toggle_history():
+    """Show or hide the history section (on_click callback)"""
+    st.session_state["show_history"] = not st.session_state["show_history"]
+
+def clear_history():
+    """Delete all predictions and favorites (on_click callback)"""
+    st.session_state["history"] = []
+    st.session_state["favorites"] = set()
+    st.session_state["displayed_prediction"] = False
+    # Truncating is all it takes to persist an empty history
+    try:
+        get_history_writer().clear()
+        st.session_state["history_dirty"] = False
+    except Exception as e:
+        st.error(f"Error clearing history file: {e}")
+
 def show_empty_history():
     st.info("📭 No predictions yet. Make your first prediction to see history here!")
 
 def show_dashboard(study_hours, attendance, mental_health, sleep_hours, part_time_job):
-    dashboard_html = ""
+    dashboard_html = build_dashboard_html(study_hours, attendance, mental_health, sleep_hours, part_time_job)
+    st.markdown(dashboard_html, unsafe_allow_html=True)
+
+def build_dashboard_html(study_hours, attendance, mental_health, sleep_hours, part_time_job):
+    """Dashboard cards for one set of inputs"""
     inputs = [
         ("📚 Study Hours", f"{study_hours}h"),
         ("🏫 Attendance", f"{attendance}%"),
@@ -576,30 +924,22 @@ def show_dashboard(study_hours, attendance, mental_health, sleep_hours, part_tim
         ("💤 Sleep Hours", f"{sleep_hours}h"),
         ("💼 Part-time Job", part_time_job)
     ]
-    for label, value in inputs:
-        dashboard_html += f"""
-        <div style='background:#2e2e3e; border-radius:12px; padding:10px; margin-bottom:8px;
-                    box-shadow: 0 0 10px #00b4d8, 0 0 15px #00b4d8; text-align:center;'>
-            <h5 style='color:#00b4d8; margin:0'>{label}</h5>
-            <p style='font-size:18px; color:white; font-weight:bold; margin:0'>{value}</p>
-        </div>
-        """
-    st.markdown(dashboard_html, unsafe_allow_html=True)
+    return "".join(DASHBOARD_CARD_HTML.format(label=label, value=value) for label, value in inputs)
+
+@st.fragment
+def history_panel():
+    """History panel; tab, selectbox and table interactions rerun only this fragment"""
+    if st.session_state["show_history"]:
+        show_enhanced_history_section()
 
 def show_enhanced_history_section():
     if st.session_state["history"]:
-        st.markdown("""
-        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    padding: 20px; border-radius: 15px; margin-bottom: 20px;'>
-            <h2 style='color: white; text-align: center; margin: 0;'>📜 Prediction History</h2>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(BANNER_HTML.format(title="📜 Prediction History"), unsafe_allow_html=True)
         
         # Show data info
-        if "last_saved" in st.session_state.get("history", [{}])[-1]:
-            last_entry = st.session_state["history"][-1]
-            if "Timestamp" in last_entry:
-                st.caption(f"📅 Last prediction: {last_entry['Timestamp']} • Total predictions: {len(st.session_state['history'])}")
+        last_entry = st.session_state["history"][-1]
+        if "Timestamp" in last_entry:
+            st.caption(f"📅 Last prediction: {format_timestamp(last_entry['Timestamp'])} • Total predictions: {len(st.session_state['history'])}")
         
         tab1, tab2, tab3 = st.tabs(["📋 All Predictions", "⭐ Favorites", "🔍 Compare"])
         
@@ -612,97 +952,61 @@ def show_enhanced_history_section():
     else:
         show_empty_history()
 
+# ----------------- PERSISTENT DATA ----------------- #
+# Load persistent data on first run
+if not st.session_state["persistent_loaded"]:
+    if load_history():
+        st.success("📁 Loaded previous session data!")
+    st.session_state["persistent_loaded"] = True
+
 # ----------------- MAIN APP ----------------- #
-st.markdown("<h1 style='text-align:center; color:#00b4d8;'>📊 Student Exam Score Predictor</h1>", unsafe_allow_html=True)
+st.markdown(TITLE_HTML, unsafe_allow_html=True)
 
 # Check if we should show analysis
 if st.session_state["analyze_config"] is not None:
+    # The profile form is not rendered here, and Streamlit drops the state of widgets
+    # that are not rendered; re-assigning the keys keeps the inputs for when it returns.
+    # Only done here: re-assigning them while the form is shown would push the last
+    # submitted values back over sliders the user has moved but not submitted.
+    for k in defaults:
+        st.session_state[k] = st.session_state[k]
     show_simple_analysis(st.session_state["analyze_config"])
 else:
     col_inputs, col_dashboard = st.columns([2,1])
 
     with col_inputs:
-        st.markdown("<h3 style='color:#00b4d8;'>📝 Student Profile</h3>", unsafe_allow_html=True)
+        st.markdown(PROFILE_HEADER_HTML, unsafe_allow_html=True)
         
-        # Initialize session state with defaults if not exists
-        for k, v in defaults.items():
-            if k not in st.session_state:
-                st.session_state[k] = v
-        
-        # Get current values from session state
-        study_hours = st.slider("📚 Study Hours per day", 0.0, 12.0, float(st.session_state["study_hours"]), 0.5)
-        attendance = st.slider("🏫 Attendance (%)", 0, 100, int(st.session_state["attendance"]), 1)
-        mental_health = st.slider("🧠 Mental Health (1-10)", 1, 10, int(st.session_state["mental_health"]), 1)
-        sleep_hours = st.slider("💤 Sleep Hours per night", 0.0, 12.0, float(st.session_state["sleep_hours"]), 0.5)
-        
-        part_time_index = 0 if st.session_state["part_time_job"] == "No" else 1
-        part_time_job = st.selectbox("💼 Do you have a Part-time Job?", ["No","Yes"], index=part_time_index)
-        
-        # Update session state
-        st.session_state["study_hours"] = study_hours
-        st.session_state["attendance"] = attendance
-        st.session_state["mental_health"] = mental_health
-        st.session_state["sleep_hours"] = sleep_hours
-        st.session_state["part_time_job"] = part_time_job
-        
-        part_time_binary = 1 if part_time_job=="Yes" else 0
+        # The inputs live in a form, so moving a slider does not rerun the app;
+        # their values are kept in session_state under the widget keys
+        with st.form("profile"):
+            study_hours = st.slider("📚 Study Hours per day", 0.0, 12.0, step=0.5, key="study_hours")
+            attendance = st.slider("🏫 Attendance (%)", 0, 100, step=1, key="attendance")
+            mental_health = st.slider("🧠 Mental Health (1-10)", 1, 10, step=1, key="mental_health")
+            sleep_hours = st.slider("💤 Sleep Hours per night", 0.0, 12.0, step=0.5, key="sleep_hours")
+            part_time_job = st.selectbox("💼 Do you have a Part-time Job?", ["No","Yes"], key="part_time_job")
+            
+            st.form_submit_button("🎯 Predict Score", use_container_width=True, type="primary",
+                                  on_click=predict_score, disabled=st.session_state["prediction_made"])
 
         # Buttons
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if not st.session_state["prediction_made"]:
-                if st.button("🎯 Predict Score", use_container_width=True, type="primary"):
-                    with st.spinner("🔮 Predicting your score..."):
-                        time.sleep(1)
-                        input_data = np.array([[study_hours, attendance, mental_health, sleep_hours, part_time_binary]])
-                        prediction = model.predict(input_data)[0]
-                        prediction = max(0, min(100, round(prediction, 1)))
-                        st.session_state["prediction"] = prediction
-                        st.session_state["prediction_made"] = True
-                        st.session_state["displayed_prediction"] = False
-                        
-                        # Add to history
-                        st.session_state["history"].append({
-                            "Study Hours": study_hours,
-                            "Attendance": attendance,
-                            "Mental Health": mental_health,
-                            "Sleep Hours": sleep_hours,
-                            "Part-time Job": part_time_job,
-                            "Predicted Score": prediction
-                        })
-                        add_timestamp_to_history()
-                        
-                        # Trigger rerun to show prediction
-                        st.rerun()
-            else:
-                if st.button("🔄 Predict Again", use_container_width=True):
-                    # Reset to defaults
-                    for k, v in defaults.items():
-                        st.session_state[k] = v
-                    st.session_state["prediction"] = None
-                    st.session_state["prediction_made"] = False
-                    st.session_state["show_history"] = False
-                    st.session_state["analyze_config"] = None
-                    st.session_state["displayed_prediction"] = False
-                    st.rerun()
+            st.button("🔄 Predict Again", use_container_width=True, on_click=reset_prediction,
+                      disabled=not st.session_state["prediction_made"])
         
+        # State changes happen in on_click callbacks, so the rerun Streamlit
+        # performs after each click already renders the new state
         with col2:
             history_text = "📜 Hide History" if st.session_state["show_history"] else "📜 View History"
-            if st.button(history_text, use_container_width=True):
-                st.session_state["show_history"] = not st.session_state["show_history"]
-                st.rerun()
+            st.button(history_text, use_container_width=True, on_click=toggle_history)
         
         with col3:
-            if st.button("🗑️ Clear All History", use_container_width=True):
-                st.session_state["history"] = []
-                st.session_state["favorites"] = []
-                st.session_state["displayed_prediction"] = False
-                save_history()
-                st.rerun()
+            st.button("🗑️ Clear All History", use_container_width=True, on_click=clear_history)
 
     with col_dashboard:
-        st.markdown("<h3 style='color:#00b4d8;'>📊 Dashboard</h3>", unsafe_allow_html=True)
+        st.markdown(DASHBOARD_HEADER_HTML, unsafe_allow_html=True)
         show_dashboard(study_hours, attendance, mental_health, sleep_hours, part_time_job)
 
     # ----------------- PREDICTION DISPLAY ----------------- #
@@ -717,20 +1021,18 @@ else:
             display_static_score(prediction)
         
         st.markdown("---")
-        st.markdown("<h3 style='color:#00b4d8;'>💡 Quick Tips</h3>", unsafe_allow_html=True)
+        st.markdown(TIPS_HEADER_HTML, unsafe_allow_html=True)
         tips = get_study_tips(prediction, study_hours, attendance, mental_health, sleep_hours, part_time_job)
-        for tip in tips:
-            st.markdown(f"- {tip}")
+        st.markdown("\n".join(f"- {tip}" for tip in tips))
 
     # ----------------- HISTORY DISPLAY ----------------- #
-    if st.session_state["show_history"]:
-        show_enhanced_history_section()
+    history_panel()
 
 # ----------------- FOOTER ----------------- #
 st.divider()
-st.markdown("""
-<div style='text-align:center; color:#888;'>
-    <p>👨‍💻 Developed by Ujwal | 📊 Student Performance Predictor</p>
-    <p style='font-size: 12px;'>💾 History is automatically saved and will persist between sessions</p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+# ----------------- SAVE ----------------- #
+# Once the page is rendered, write any favorite/delete changes that are due;
+# all mutations made during this run go out in that single write
+flush_history_if_due()